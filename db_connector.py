@@ -1,8 +1,11 @@
 import psycopg2
-import json
-import pandas as pd
+import psycopg2.pool
+import orjson
+import hashlib
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from psycopg2.extras import Json
 
 # Database connection parameters - update these to match your local setup
 DB_CONFIG = {
@@ -13,112 +16,186 @@ DB_CONFIG = {
     'port': '5432'
 }
 
-def connect_to_db():
-    """Establish connection to PostgreSQL database"""
-    try:
-        conn = psycopg2.connect(**DB_CONFIG)
-        return conn
-    except Exception as e:
-        print(f"Error connecting to database: {e}")
-        return None
+# Shared connection pool - created lazily so importing this module
+# does not require a running database
+connection_pool = None
+
+def get_connection_pool():
+    """Get (or create) the shared threaded connection pool"""
+    global connection_pool
+    if connection_pool is None:
+        try:
+            connection_pool = psycopg2.pool.ThreadedConnectionPool(
+                minconn=2, maxconn=8, **DB_CONFIG)
+            conn = connection_pool.getconn()
+            try:
+                ensure_query_cache(conn)
+            finally:
+                connection_pool.putconn(conn)
+        except Exception as e:
+            print(f"Error creating connection pool: {e}")
+            return None
+    return connection_pool
+
+def ensure_query_cache(conn):
+    """Create the dashboard query result cache table if it does not exist"""
+    with conn.cursor() as cursor:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS dashboard_query_cache (
+                cache_key TEXT PRIMARY KEY,
+                payload JSONB,
+                created_at TIMESTAMPTZ
+            )
+        """)
+    conn.commit()
+
+def _json_dumps(obj):
+    """JSON-serialize query results, falling back to str for Decimals etc."""
+    return orjson.dumps(obj, default=str).decode()
+
+# Detail/trend queries streamed through a server-side cursor so the client
+# never buffers the whole result set at once
+STREAMED_QUERIES = ("recent_trials", "recent_incidents",
+                    "enrollment_trends", "enrollment_by_phase")
+
+# Query names already PREPAREd per connection; the pool keeps its
+# connections alive for the process lifetime, so id() is a stable key
+_prepared_statements = {}
+
+def _strip_comments(query):
+    """Drop SQL comment lines so only the statement body is prepared"""
+    return "\n".join(line for line in query.splitlines()
+                     if not line.strip().startswith('--'))
+
+def _ensure_prepared(conn, name, query):
+    """PREPARE the named statement on this connection if not done already
+
+    Re-executing a prepared statement skips the server-side parse and
+    plan of the ~40-line query text on every refresh.
+    """
+    prepared = _prepared_statements.setdefault(id(conn), set())
+    if name not in prepared:
+        with conn.cursor() as cursor:
+            cursor.execute(f"PREPARE dash_{name} AS {_strip_comments(query)}")
+        prepared.add(name)
+
+def _fetch_records(conn, name, query):
+    """Fetch all rows for a query as a list of dicts
+
+    Queries listed in STREAMED_QUERIES run on a named server-side cursor
+    with itersize=1000, so Postgres streams rows as they are produced and
+    client memory stays bounded; the rest execute a per-connection
+    prepared statement on a plain client-side cursor.
+    """
+    if name in STREAMED_QUERIES:
+        with conn.cursor(name='dash_' + name) as cursor:
+            cursor.itersize = 1000
+            cursor.execute(query)
+            columns = None
+            records = []
+            for row in cursor:
+                if columns is None:
+                    columns = [desc[0] for desc in cursor.description]
+                records.append(dict(zip(columns, row)))
+            return records
+    statement = query
+    if name is not None:
+        _ensure_prepared(conn, name, query)
+        statement = f"EXECUTE dash_{name}"
+    with conn.cursor() as cursor:
+        cursor.execute(statement)
+        columns = [desc[0] for desc in cursor.description]
+        return [dict(zip(columns, r)) for r in cursor.fetchall()]
+
+def execute_query(conn, query, name=None):
+    """Execute a SQL query and return results as a list of row dicts
 
-def execute_query(conn, query):
-    """Execute a SQL query and return results as DataFrame"""
+    Rows are fetched straight off the cursor and zipped with the column
+    names - the only consumer is the JSON dump, so building a DataFrame
+    per query was pure overhead (type inference plus one extra Python
+    object per cell).
+
+    Results are cached in the dashboard_query_cache table for one hour -
+    the dashboard queries are deterministic aggregations over slowly
+    changing tables, so repeated refreshes can skip the aggregation.
+    """
     try:
-        df = pd.read_sql_query(query, conn)
-        return df
+        cache_key = hashlib.blake2b(query.encode()).hexdigest()
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT payload FROM dashboard_query_cache "
+                "WHERE cache_key = %s AND created_at > now() - interval '1 hour'",
+                (cache_key,))
+            row = cursor.fetchone()
+            if row is not None:
+                return row[0]
+            # Bound tail latency so one slow query cannot stall the whole refresh
+            cursor.execute("SET LOCAL statement_timeout = '60s'")
+        records = _fetch_records(conn, name, query)
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO dashboard_query_cache (cache_key, payload, created_at) "
+                "VALUES (%s, %s, now()) "
+                "ON CONFLICT (cache_key) DO UPDATE "
+                "SET payload = EXCLUDED.payload, created_at = now()",
+                (cache_key, Json(records, dumps=_json_dumps)))
+        conn.commit()
+        return records
     except Exception as e:
         print(f"Error executing query: {e}")
         return None
 
+def run_query(name, query):
+    """Run a single named query on a connection borrowed from the pool"""
+    pool = get_connection_pool()
+    if pool is None:
+        return name, None
+    conn = pool.getconn()
+    try:
+        print(f"Executing query: {name}")
+        return name, execute_query(conn, query, name)
+    finally:
+        # End the implicit transaction (closes the SET LOCAL scope)
+        conn.rollback()
+        pool.putconn(conn)
+
 def run_all_queries():
     """Run all queries from reporting_queries.sql and save results"""
-    conn = connect_to_db()
-    if not conn:
+    if get_connection_pool() is None:
         print("Failed to connect to database")
         return
-    
+
     # Define queries with names for dashboard sections
     queries = {
         "kpi_total_patients": """
-            -- Using updated logic from repoting_queries.sql
-            SELECT
-                COUNT(DISTINCT patient_id) as total_patients,
-                'All Time' as period
-            FROM synthetic_ehr
-            UNION ALL
-            SELECT
-                COUNT(DISTINCT patient_id) as total_patients,
-                'Last 30 Days' as period
-            FROM synthetic_ehr
-            WHERE created_at >= CURRENT_DATE - INTERVAL '30 days'
+            -- Served from the hourly rollup defined in dashboard_rollups.sql
+            SELECT * FROM mv_kpi_patients
         """,
-        
+
         "kpi_active_trials": """
-            -- Using updated logic from repoting_queries.sql
-            SELECT
-                COUNT(*) as active_trials,
-                COUNT(CASE WHEN phase = 'Phase I' THEN 1 END) as phase_1,
-                COUNT(CASE WHEN phase = 'Phase II' THEN 1 END) as phase_2,
-                COUNT(CASE WHEN phase = 'Phase III' THEN 1 END) as phase_3,
-                COUNT(CASE WHEN phase = 'Phase IV' THEN 1 END) as phase_4
-            FROM clinical_trials
-            WHERE status IN ('Active', 'Recruiting', 'Enrolling')
+            -- Served from the hourly rollup defined in dashboard_rollups.sql
+            SELECT * FROM mv_kpi_active_trials
         """,
-        
+
         "kpi_safety_incidents": """
-            -- Using updated logic from repoting_queries.sql
-            SELECT
-                COUNT(*) as total_incidents,
-                COUNT(CASE WHEN serious = false THEN 1 END) as mild_incidents,
-                COUNT(CASE WHEN serious = true THEN 1 END) as moderate_incidents,
-                0 as severe_incidents,
-                0 as critical_incidents,
-                ROUND(AVG(CASE WHEN serious = true THEN 8 ELSE 2 END), 2) as avg_severity_score
-            FROM drug_safety
-            WHERE report_date >= CURRENT_DATE - INTERVAL '30 days'
+            -- Served from the hourly rollup defined in dashboard_rollups.sql
+            SELECT * FROM mv_kpi_safety_incidents
         """,
-        
+
         "kpi_drug_portfolio": """
-            -- Using updated logic from Query 6: Comprehensive Drug Portfolio Analysis in repoting_queries.sql
-            SELECT
-                COUNT(DISTINCT don.drug_name) as total_drugs_studied,
-                COUNT(DISTINCT don.drug_class) as drug_categories,
-                COUNT(DISTINCT CASE WHEN don.approved = true THEN don.drug_name END) as approved_drugs,
-                COUNT(DISTINCT ds.drug_name) as under_review
-            FROM drug_ontology don
-            LEFT JOIN drug_safety ds ON don.drug_id = ds.drug_id
+            -- Served from the hourly rollup defined in dashboard_rollups.sql
+            SELECT * FROM mv_kpi_drug_portfolio
         """,
-        
+
         "enrollment_trends": """
-            -- Keeping existing logic as there's no direct equivalent in repoting_queries.sql
-            SELECT
-                DATE_TRUNC('month', start_date) as enrollment_month,
-                TO_CHAR(DATE_TRUNC('month', start_date), 'Mon YYYY') as month_label,
-                COUNT(*) as new_enrollments,
-                COUNT(DISTINCT trial_id) as active_trials_that_month,
-                ROUND(COUNT(*)::numeric / COUNT(DISTINCT trial_id), 1) as avg_enrollment_per_trial
-            FROM clinical_trials
-            WHERE start_date >= CURRENT_DATE - INTERVAL '12 months'
-                AND start_date IS NOT NULL
-            GROUP BY DATE_TRUNC('month', start_date)
+            -- Served from the hourly rollup defined in dashboard_rollups.sql
+            SELECT * FROM mv_enrollment_by_month
             ORDER BY enrollment_month
         """,
-        
+
         "enrollment_by_phase": """
-            -- Keeping existing logic as there's no direct equivalent in repoting_queries.sql
-            SELECT
-                phase,
-                COUNT(*) as total_enrolled,
-                COUNT(DISTINCT trial_id) as number_of_trials,
-                ROUND(AVG(CASE WHEN phase = 'Phase I' THEN 150 WHEN phase = 'Phase II' THEN 200 WHEN phase = 'Phase III' THEN 250 WHEN phase = 'Phase IV' THEN 500 ELSE 100 END), 0) as avg_target_enrollment,
-                ROUND(
-                    (COUNT(*)::numeric / NULLIF(SUM(CASE WHEN phase = 'Phase I' THEN 150 WHEN phase = 'Phase II' THEN 200 WHEN phase = 'Phase III' THEN 250 WHEN phase = 'Phase IV' THEN 500 ELSE 100 END), 0)) * 100,
-                    1
-                ) as enrollment_rate_percent
-            FROM clinical_trials
-            WHERE start_date IS NOT NULL
-            GROUP BY phase
+            -- Served from the hourly rollup defined in dashboard_rollups.sql
+            SELECT * FROM mv_enrollment_by_phase
             ORDER BY
                 CASE phase
                     WHEN 'Phase I' THEN 1
@@ -127,53 +204,60 @@ def run_all_queries():
                     WHEN 'Phase IV' THEN 4
                 END
         """,
-        
+
         "safety_timeline": """
-            -- Using updated logic from Query 8: Time-based Trend Analysis in repoting_queries.sql
-            SELECT
-                DATE_TRUNC('quarter', ds.report_date) as incident_week,
-                TO_CHAR(DATE_TRUNC('quarter', ds.report_date), 'YYYY-Q') as week_label,
-                COUNT(*) as total_incidents,
-                COUNT(CASE WHEN ds.serious = false THEN 1 END) as mild_events,
-                COUNT(CASE WHEN ds.serious = true THEN 1 END) as moderate_events,
-                COUNT(CASE WHEN ds.serious = true THEN 1 END) as severe_events,
-                0 as critical_events,
-                ROUND(AVG(CASE WHEN ds.serious = true THEN 8 ELSE 2 END), 2) as weekly_avg_severity
-            FROM drug_safety ds
-            INNER JOIN conditions c ON ds.condition_id = c.condition_id
-            WHERE ds.report_date IS NOT NULL
-                AND ds.report_date >= '2020-01-01'
-            GROUP BY DATE_TRUNC('quarter', ds.report_date)
+            -- Served from the hourly rollup defined in dashboard_rollups.sql
+            SELECT * FROM mv_safety_by_quarter
             ORDER BY incident_week
         """,
         
         "recent_trials": """
             -- Keeping existing logic as there's no direct equivalent in repoting_queries.sql
-            SELECT DISTINCT ON (ct.trial_id)
-                ct.trial_id,
+            -- One row per trial: duplicate trial rows are ranked away in a
+            -- single window pass (instead of the old DISTINCT ON + GROUP BY
+            -- combination), and the ontology side is deduplicated before the
+            -- join - generic_name is not unique in drug_ontology, so joining
+            -- it raw would fan each trial out to one row per matching drug row
+            WITH targets(phase, target_enrollment) AS (
+                VALUES ('Phase I', 150), ('Phase II', 200), ('Phase III', 250), ('Phase IV', 500)
+            ),
+            ranked AS (
+                SELECT
+                    ct.*,
+                    row_number() OVER (PARTITION BY ct.trial_id ORDER BY ct.start_date DESC) as rn,
+                    COUNT(*) OVER (PARTITION BY ct.trial_id) as enrolled_patients
+                FROM clinical_trials ct
+            ),
+            drug_names AS (
+                SELECT DISTINCT ON (generic_name) generic_name, drug_name
+                FROM drug_ontology
+                ORDER BY generic_name, drug_id
+            )
+            SELECT
+                s.trial_id,
                 d.drug_name,
-                ct.phase,
-                ct.status,
-                COUNT(*) as enrolled_patients,
-                CASE WHEN ct.phase = 'Phase I' THEN 150 WHEN ct.phase = 'Phase II' THEN 200 WHEN ct.phase = 'Phase III' THEN 250 WHEN ct.phase = 'Phase IV' THEN 500 ELSE 100 END as target_enrollment,
+                s.phase,
+                s.status,
+                s.enrolled_patients,
+                COALESCE(t.target_enrollment, 100) as target_enrollment,
                 ROUND(
-                    COUNT(*)::numeric / NULLIF(CASE WHEN ct.phase = 'Phase I' THEN 150 WHEN ct.phase = 'Phase II' THEN 200 WHEN ct.phase = 'Phase III' THEN 250 WHEN ct.phase = 'Phase IV' THEN 500 ELSE 100 END, 0) * 100,
+                    s.enrolled_patients::numeric / NULLIF(COALESCE(t.target_enrollment, 100), 0) * 100,
                     0
                 ) as enrollment_progress,
-                ct.start_date,
-                ct.end_date as expected_completion_date,
+                s.start_date,
+                s.end_date as expected_completion_date,
                 CASE
-                    WHEN ct.status = 'Active' THEN 'success'
-                    WHEN ct.status = 'Completed' THEN 'info'
-                    WHEN ct.status = 'Suspended' THEN 'warning'
-                    WHEN ct.status = 'Terminated' THEN 'danger'
+                    WHEN s.status = 'Active' THEN 'success'
+                    WHEN s.status = 'Completed' THEN 'info'
+                    WHEN s.status = 'Suspended' THEN 'warning'
+                    WHEN s.status = 'Terminated' THEN 'danger'
                     ELSE 'secondary'
                 END as status_class
-            FROM clinical_trials ct
-            LEFT JOIN drug_ontology d ON ct.intervention = d.generic_name
-            GROUP BY ct.trial_id, d.drug_name, ct.phase, ct.status, ct.phase,
-                     ct.start_date, ct.end_date
-            ORDER BY ct.trial_id, ct.start_date DESC
+            FROM ranked s
+            LEFT JOIN drug_names d ON s.intervention = d.generic_name
+            LEFT JOIN targets t ON s.phase = t.phase
+            WHERE s.rn = 1
+            ORDER BY s.trial_id
         """,
         
         "recent_incidents": """
@@ -193,61 +277,43 @@ def run_all_queries():
             FROM drug_safety ds
             INNER JOIN drug_ontology don ON ds.drug_id = don.drug_id
             INNER JOIN conditions c ON ds.condition_id = c.condition_id
-            WHERE ds.adverse_event IN ('Death', 'Liver Damage', 'Heart Attack', 'Stroke')
+            -- = ANY keeps the same plan shape when the list is later bound as
+            -- a parameter, and matches the partial idx_ds_red_flags index
+            WHERE ds.adverse_event = ANY(ARRAY['Death', 'Liver Damage', 'Heart Attack', 'Stroke']::text[])
             ORDER BY ds.report_date DESC
             LIMIT 15
         """,
         
         "demographics": """
-            -- Using updated logic from Query 7: Patient Demographics and Outcomes by Condition in repoting_queries.sql
-            SELECT
-                CASE
-                    WHEN se.age < 18 THEN 'Pediatric'
-                    WHEN se.age BETWEEN 18 AND 65 THEN 'Adult'
-                    ELSE 'Elderly'
-                END as age_group,
-                se.gender,
-                COUNT(*) as patient_count,
-                ROUND(COUNT(*)::numeric / SUM(COUNT(*)) OVER() * 100, 1) as percentage,
-                ROUND(AVG(se.age), 1) as avg_age_in_group
-            FROM synthetic_ehr se
-            INNER JOIN conditions c ON se.condition_id = c.condition_id
-            WHERE se.age IS NOT NULL AND se.gender IS NOT NULL
-            GROUP BY
-                CASE
-                    WHEN se.age < 18 THEN 'Pediatric'
-                    WHEN se.age BETWEEN 18 AND 65 THEN 'Adult'
-                    ELSE 'Elderly'
-                END,
-                se.gender
-            ORDER BY
-                CASE
-                    WHEN se.age < 18 THEN 'Pediatric'
-                    WHEN se.age BETWEEN 18 AND 65 THEN 'Adult'
-                    ELSE 'Elderly'
-                END,
-                se.gender
+            -- Served from the hourly rollup defined in dashboard_rollups.sql
+            SELECT * FROM mv_demographics
+            ORDER BY age_group, gender
         """
     }
     
-    # Execute all queries and store results
+    # Execute all queries concurrently - they are mutually independent and
+    # I/O-bound on the database round-trip, so wall-clock time drops to
+    # roughly the slowest query instead of the sum of all of them
     results = {}
-    for name, query in queries.items():
-        print(f"Executing query: {name}")
-        df = execute_query(conn, query)
-        if df is not None:
-            # Convert DataFrame to JSON-serializable format
-            results[name] = df.to_dict('records')
-        else:
-            results[name] = []
-            print(f"Failed to execute query: {name}")
-    
-    # Save results to JSON file
-    with open('dashboard_data.json', 'w') as f:
-        json.dump(results, f, default=str, indent=2)
-    
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [executor.submit(run_query, name, query)
+                   for name, query in queries.items()]
+        for future in as_completed(futures):
+            name, records = future.result()
+            if records is not None:
+                results[name] = records
+            else:
+                results[name] = []
+                print(f"Failed to execute query: {name}")
+
+    # Save results to JSON file - orjson serializes datetimes natively and
+    # is several times faster than the stdlib encoder
+    with open('dashboard_data.json', 'wb') as f:
+        f.write(orjson.dumps(results, default=str,
+                             option=orjson.OPT_INDENT_2 | orjson.OPT_NAIVE_UTC))
+
     print("All queries executed and data saved to dashboard_data.json")
-    conn.close()
+    connection_pool.closeall()
 
 if __name__ == "__main__":
     run_all_queries()
\ No newline at end of file
@@ -4,25 +4,60 @@ Deployment script for Healthcare Research Dashboard
 This script automates the process of generating dashboard data and preparing files for GitHub Pages deployment.
 """
 
+import gzip
 import os
-import subprocess
 import shutil
 import sys
 import json
 from datetime import datetime
 
-def run_db_connector():
-    """Run the database connector script to generate dashboard data"""
-    print("Running database connector to generate dashboard data...")
+import db_connector
+
+# Rollups defined in dashboard_rollups.sql, refreshed before reading
+DASHBOARD_VIEWS = [
+    "mv_kpi_patients",
+    "mv_kpi_active_trials",
+    "mv_kpi_safety_incidents",
+    "mv_kpi_drug_portfolio",
+    "mv_enrollment_by_month",
+    "mv_enrollment_by_phase",
+    "mv_safety_by_quarter",
+    "mv_demographics",
+]
+
+def refresh_dashboard_data():
+    """Refresh the dashboard rollups and regenerate dashboard data in-process
+
+    Importing db_connector instead of spawning it as a subprocess avoids a
+    second interpreter start-up and re-import of the database stack; the
+    rollup refresh itself is a handful of statements on one connection.
+    """
+    print("Refreshing dashboard rollups and generating dashboard data...")
     try:
-        result = subprocess.run([sys.executable, "db_connector.py"], 
-                              capture_output=True, text=True, check=True)
-        print("Database connector executed successfully!")
-        print(result.stdout)
+        pool = db_connector.get_connection_pool()
+        if pool is None:
+            print("Failed to connect to database")
+            return False
+        conn = pool.getconn()
+        try:
+            # CONCURRENTLY cannot run inside a transaction block, so
+            # refresh each view in autocommit mode
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                for view in DASHBOARD_VIEWS:
+                    cursor.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view}")
+                # Drop cached query results so run_all_queries reads the
+                # freshly refreshed views instead of pre-refresh payloads
+                # cached within the last hour
+                cursor.execute("DELETE FROM dashboard_query_cache")
+        finally:
+            conn.autocommit = False
+            pool.putconn(conn)
+        db_connector.run_all_queries()
+        print("Dashboard data generated successfully!")
         return True
-    except subprocess.CalledProcessError as e:
-        print(f"Error running database connector: {e}")
-        print(f"Error output: {e.stderr}")
+    except Exception as e:
+        print(f"Error generating dashboard data: {e}")
         return False
 
 def create_docs_directory():
@@ -52,6 +87,14 @@ def copy_files_to_docs():
             print(f"Copied {file} to docs/")
         else:
             print(f"Warning: {file} not found")
+
+    # Precompress the dashboard data so gzip-aware servers can send the
+    # compressed payload directly (~8x smaller on the wire)
+    if os.path.exists("docs/dashboard_data.json"):
+        with open("docs/dashboard_data.json", "rb") as src, \
+                gzip.open("docs/dashboard_data.json.gz", "wb", compresslevel=9) as dst:
+            shutil.copyfileobj(src, dst)
+        print("Created docs/dashboard_data.json.gz")
     
     # Create a simple redirect if index.html doesn't exist in root
     if not os.path.exists("index.html"):
@@ -96,8 +139,8 @@ def main():
     print("Healthcare Research Dashboard Deployment Script")
     print("=" * 50)
     
-    # Step 1: Run database connector
-    if not run_db_connector():
+    # Step 1: Refresh rollups and generate dashboard data
+    if not refresh_dashboard_data():
         print("Failed to generate dashboard data. Exiting.")
         return False
     
@@ -17,10 +17,11 @@ try:
 except:
     pass
 
+import numpy as np
 import pandas as pd
 import torch
 from transformers import AutoTokenizer, AutoModel
-from sklearn.metrics.pairwise import cosine_similarity
+import functools
 import sys
 import time
 
@@ -41,8 +42,10 @@ try:
     # Explicitly specify PyTorch framework
     model = AutoModel.from_pretrained(MODEL_NAME, trust_remote_code=True)
     
-    # Move model to device
+    # Move model to device in half precision - roughly 2x throughput and
+    # half the memory; BF16 on CPU, FP16 on CUDA tensor cores
     model = model.to(device)
+    model = model.to(dtype=torch.bfloat16 if device.type == 'cpu' else torch.float16)
     model.eval()
     
     print("BioBERT model loaded successfully!")
@@ -52,21 +55,43 @@ except Exception as e:
     print("pip install torch transformers scikit-learn pandas")
     sys.exit(1)
 
-def get_embedding(text):
-    """Generate BioBERT embedding for text"""
+def get_embeddings_batch(texts):
+    """Generate BioBERT embeddings for a batch of texts in one forward pass"""
     try:
-        # Tokenize and move to device
-        inputs = tokenizer(text, return_tensors="pt", truncation=True, max_length=50, padding=True)
+        # Tokenize the whole batch and move to device
+        inputs = tokenizer(list(texts), return_tensors="pt", truncation=True, max_length=50, padding=True)
         inputs = {k: v.to(device) for k, v in inputs.items()}
-        
-        with torch.no_grad():
-            outputs = model(**inputs)
-        # Mean pooling of last hidden state
-        embedding = outputs.last_hidden_state.mean(dim=1).cpu().numpy()
-        return embedding
+
+        with torch.inference_mode():
+            if device.type == 'cuda':
+                with torch.autocast(device_type='cuda', dtype=torch.float16):
+                    outputs = model(**inputs)
+            else:
+                outputs = model(**inputs)
+        # Cast back to float32 so downstream cosine similarity keeps its
+        # precision, then masked mean pooling so padding tokens do not
+        # dilute the embeddings
+        hidden = outputs.last_hidden_state.float()
+        mask = inputs["attention_mask"].unsqueeze(-1)
+        summed = (hidden * mask).sum(dim=1)
+        embeddings = (summed / mask.sum(dim=1)).cpu().numpy()
+        return embeddings
     except Exception as e:
-        print(f"Error generating embedding for text '{text}': {e}")
+        print(f"Error generating embeddings for batch of {len(texts)} texts: {e}")
+        return None
+
+@functools.lru_cache(maxsize=100_000)
+def get_embedding(text):
+    """Generate BioBERT embedding for a single text
+
+    The model is deterministic, so repeated surface forms (common in real
+    disambiguation workloads) are served from an in-process cache instead
+    of paying another forward pass.
+    """
+    embeddings = get_embeddings_batch([text])
+    if embeddings is None:
         return None
+    return embeddings[0:1]  # keep the (1, hidden) shape expected downstream
 
 # =========================
 # Example Ontology Dictionary with Context
@@ -81,50 +106,85 @@ ontology_terms = {
     "Atorvastatin": ("83367", "RxNorm")
 }
 
+ONTOLOGY_CACHE = "ontology_embeddings.npz"
+
 print("Generating embeddings for ontology terms...")
 ontology_embeddings = {}
-for i, term in enumerate(ontology_terms.keys()):
-    print(f"  Processing {i+1}/{len(ontology_terms)}: {term}")
-    embedding = get_embedding(term)
-    if embedding is not None:
-        ontology_embeddings[term] = embedding
-    else:
-        print(f"    Warning: Failed to generate embedding for '{term}'")
+ontology_term_list = list(ontology_terms.keys())
+
+# Embeddings are deterministic, so reuse the ones saved by a previous run
+# as long as the ontology has not changed
+batch_embeddings = None
+if os.path.exists(ONTOLOGY_CACHE):
+    try:
+        cached = np.load(ONTOLOGY_CACHE, allow_pickle=False)
+        if list(cached["terms"]) == ontology_term_list:
+            batch_embeddings = cached["embeddings"]
+            print(f"  Loaded cached embeddings from {ONTOLOGY_CACHE}")
+    except Exception as e:
+        print(f"  Warning: Could not load {ONTOLOGY_CACHE}: {e}")
+
+if batch_embeddings is None:
+    batch_embeddings = get_embeddings_batch(ontology_term_list)
+    if batch_embeddings is not None:
+        np.savez(ONTOLOGY_CACHE,
+                 terms=np.array(ontology_term_list),
+                 embeddings=batch_embeddings)
+
+if batch_embeddings is not None:
+    for term, embedding in zip(ontology_term_list, batch_embeddings):
+        ontology_embeddings[term] = embedding.reshape(1, -1)
+else:
+    print("    Warning: Failed to generate ontology embeddings")
 
 print(f"Generated embeddings for {len(ontology_embeddings)}/{len(ontology_terms)} ontology terms.")
 
-def disambiguate_entity(term, context=""):
-    """Resolve ambiguous term by comparing with ontology embeddings"""
-    if not ontology_embeddings:
-        print("Error: No ontology embeddings available.")
-        return None, None, None
-    
+# Stack the ontology embeddings into one L2-normalized matrix so matching
+# a candidate is a single matrix-vector product (one BLAS GEMV) instead of
+# one cosine_similarity call per term
+ontology_keys = list(ontology_embeddings)
+if ontology_embeddings:
+    _stacked = np.vstack(list(ontology_embeddings.values()))
+    ontology_matrix = _stacked / np.linalg.norm(_stacked, axis=1, keepdims=True)
+else:
+    ontology_matrix = None
+
+def _match_ontology(candidate_embedding):
+    """Find the best-matching ontology term for a candidate embedding"""
     try:
-        candidate_text = term + " " + context if context else term
-        candidate_embedding = get_embedding(candidate_text)
-        
-        if candidate_embedding is None:
-            return None, None, None
-            
-        similarities = {}
-        for k, v in ontology_embeddings.items():
-            try:
-                sim = cosine_similarity(candidate_embedding, v)[0][0]
-                similarities[k] = sim
-            except Exception as e:
-                print(f"Error computing similarity for {k}: {e}")
-                continue
-        
-        if not similarities:
-            print("Error: No similarities computed.")
-            return None, None, None
-            
-        best_match = max(similarities, key=similarities.get)
+        q = candidate_embedding.reshape(-1)
+        q = q / np.linalg.norm(q)
+        similarities = ontology_matrix @ q
+        best_match = ontology_keys[int(similarities.argmax())]
         return best_match, ontology_terms[best_match][0], ontology_terms[best_match][1]
     except Exception as e:
-        print(f"Error in disambiguate_entity: {e}")
+        print(f"Error computing similarities: {e}")
         return None, None, None
 
+def disambiguate_entities(pairs):
+    """Resolve a batch of (term, context) pairs with one forward pass"""
+    if not ontology_embeddings:
+        print("Error: No ontology embeddings available.")
+        return [(None, None, None)] * len(pairs)
+
+    try:
+        candidate_texts = [term + " " + context if context else term
+                           for term, context in pairs]
+        candidate_embeddings = get_embeddings_batch(candidate_texts)
+
+        if candidate_embeddings is None:
+            return [(None, None, None)] * len(pairs)
+
+        return [_match_ontology(embedding.reshape(1, -1))
+                for embedding in candidate_embeddings]
+    except Exception as e:
+        print(f"Error in disambiguate_entities: {e}")
+        return [(None, None, None)] * len(pairs)
+
+def disambiguate_entity(term, context=""):
+    """Resolve ambiguous term by comparing with ontology embeddings"""
+    return disambiguate_entities([(term, context)])[0]
+
 # =========================
 # Example Usage
 # =========================
@@ -138,9 +198,10 @@ if __name__ == "__main__":
     print("\nRunning disambiguation examples:")
     print("="*80)
     
-    for term, ctx in examples:
+    # All examples are embedded in a single batched forward pass
+    resolutions = disambiguate_entities(examples)
+    for (term, ctx), (match, code, source) in zip(examples, resolutions):
         print(f"Input: {term} | Context: {ctx}")
-        match, code, source = disambiguate_entity(term, ctx)
         if match:
             print(f"→ Disambiguated as: {match} | Code: {code} | Source: {source}")
         else:
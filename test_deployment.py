@@ -11,13 +11,35 @@ import webbrowser
 import threading
 import time
 
+class GzipAwareHandler(http.server.SimpleHTTPRequestHandler):
+    """Serve a precompressed .gz sibling when the client accepts gzip"""
+
+    def send_head(self):
+        if 'gzip' in self.headers.get('Accept-Encoding', ''):
+            path = self.translate_path(self.path)
+            gz_path = path + '.gz'
+            if os.path.isfile(gz_path):
+                try:
+                    f = open(gz_path, 'rb')
+                except OSError:
+                    return super().send_head()
+                fs = os.fstat(f.fileno())
+                self.send_response(200)
+                self.send_header("Content-Type", self.guess_type(path))
+                self.send_header("Content-Encoding", "gzip")
+                self.send_header("Content-Length", str(fs.st_size))
+                self.send_header("Last-Modified", self.date_time_string(fs.st_mtime))
+                self.end_headers()
+                return f
+        return super().send_head()
+
 def start_server():
     """Start a simple HTTP server to test the deployment package"""
     # Change to docs directory
     os.chdir('docs')
-    
+
     # Define the handler
-    Handler = http.server.SimpleHTTPRequestHandler
+    Handler = GzipAwareHandler
     
     # Create the server
     with socketserver.TCPServer(("", 8001), Handler) as httpd:
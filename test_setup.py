@@ -5,14 +5,26 @@ This script checks if all required files exist and if Python dependencies can be
 """
 
 import os
+import re
+import stat
 import sys
-import importlib
+import types
 
-def check_files():
-    """Check if all required files exist"""
-    print("Checking required files...")
-    
-    required_files = [
+# Requirement names whose import name differs from the project name;
+# read-only so the table is a plain hash probe and cannot drift at runtime
+_IMPORT_ALIASES = types.MappingProxyType({
+    "psycopg2-binary": "psycopg2",
+    "pyyaml": "yaml",
+    "pillow": "PIL",
+    "beautifulsoup4": "bs4",
+    "scikit-learn": "sklearn",
+})
+
+# Required files bucketed by directory, frozen at module level: existence
+# checking costs one scandir per directory instead of one stat per file,
+# and the tables are not rebuilt on every call
+REQUIRED_BY_DIR = {
+    ".": frozenset({
         "index.html",
         "db_connector.py",
         "requirements.txt",
@@ -20,83 +32,197 @@ def check_files():
         "repoting_queries.sql",
         "README.md",
         "deploy.py",
-        ".github/workflows/deploy.yml"
-    ]
-    
-    missing_files = []
-    for file in required_files:
-        if os.path.exists(file):
-            print(f"  ✓ {file}")
+    }),
+    ".github/workflows": frozenset({"deploy.yml"}),
+}
+
+REQUIRED_DIRS = ("Datasets",)
+
+# Report lines buffered for one final write - every print() is a separate
+# locked write()+flush, which adds up under CI log capture
+_output = []
+
+def _emit(text):
+    """Queue a line for the final report write"""
+    _output.append(text)
+
+def _flush_output():
+    """Write the buffered report with a single syscall"""
+    sys.stdout.write("\n".join(_output) + "\n")
+    _output.clear()
+
+def _report(header, items, found_flags, missing_label="MISSING"):
+    """Queue one batched ✓/✗ report and return True if nothing is missing"""
+    _emit(header)
+    ok = True
+    for item, found in zip(items, found_flags):
+        if found:
+            _emit(f"  ✓ {item}")
         else:
-            print(f"  ✗ {file} (MISSING)")
-            missing_files.append(file)
-    
-    return len(missing_files) == 0
+            _emit(f"  ✗ {item} ({missing_label})")
+            ok = False
+    return ok
+
+def _probe_files():
+    """Probe required files; returns _report arguments without emitting"""
+    items = []
+    found_flags = []
+    for directory, names in REQUIRED_BY_DIR.items():
+        try:
+            # is_file() reuses the d_type the scandir already fetched, so
+            # requiring a regular file costs no extra stat - and a stray
+            # directory named like a required file no longer passes
+            entries = {entry.name for entry in os.scandir(directory)
+                       if entry.is_file()}
+        except FileNotFoundError:
+            entries = set()
+        for name in sorted(names):
+            items.append(name if directory == "." else f"{directory}/{name}")
+            found_flags.append(name in entries)
+
+    return ("Checking required files...", items, found_flags, "MISSING")
+
+def check_files():
+    """Check if all required files exist"""
+    return _report(*_probe_files())
+
+def _spec_found(import_name):
+    """Return True if the import machinery can locate the module
+
+    find_spec only runs the finders - none of the module's top-level
+    code executes - with a sys.modules fast path for loaded modules.
+    """
+    if import_name in sys.modules:
+        return True
+    # Imported here so runs that never reach the dependency phase (e.g.
+    # --fast failing on files) skip loading importlib.util entirely;
+    # after the first call this resolves straight from sys.modules
+    from importlib.util import find_spec
+    try:
+        return find_spec(import_name) is not None
+    except (ImportError, ValueError):
+        return False
+
+def _probe_dependencies():
+    """Probe Python dependencies; returns _report arguments without emitting"""
+    # EAFP: just open and handle the missing-file case - a preliminary
+    # exists() check would double the syscalls and leave a race window
+    try:
+        # Stream the file line by line; partition drops both whole-line and
+        # inline comments ('flask==2.0  # web') in the same single pass
+        with open("requirements.txt", "r") as f:
+            dependencies = [s for s in (line.partition("#")[0].strip() for line in f)
+                            if s]
+    except FileNotFoundError:
+        return ("\nChecking Python dependencies...",
+                ["requirements.txt"], [False], "MISSING")
+
+    # Strip version specifiers and extras (e.g. 'pandas>=2.0',
+    # 'requests[socks]') so pinned requirements are not misreported
+    # as missing, then map project name to import name
+    import_names = []
+    for dep in dependencies:
+        name = re.split(r"[<>=!~;\[\s]", dep, 1)[0].strip()
+        import_names.append(_IMPORT_ALIASES.get(name, name))
+
+    # One throwaway lookup primes sys.path_importer_cache, so the
+    # concurrent lookups below all hit cached per-directory finders
+    # instead of each paying the first-touch directory enumeration
+    _spec_found("__prime__")
+
+    # The finder walks are independent I/O, so overlap them across a small
+    # thread pool; deduping first keeps the one-lookup-per-name memoization
+    # and results are keyed by name so output order matches the file
+    from concurrent.futures import ThreadPoolExecutor
+    unique_names = list(dict.fromkeys(import_names))
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        found_by_name = dict(zip(unique_names,
+                                 executor.map(_spec_found, unique_names)))
+
+    found_flags = [found_by_name[import_name] for import_name in import_names]
+    return ("\nChecking Python dependencies...", dependencies,
+            found_flags, "NOT INSTALLED")
 
 def check_python_dependencies():
     """Check if Python dependencies can be imported"""
-    print("\nChecking Python dependencies...")
-    
-    with open("requirements.txt", "r") as f:
-        dependencies = [line.strip() for line in f.readlines() if line.strip() and not line.startswith("#")]
-    
-    missing_deps = []
-    for dep in dependencies:
-        # Handle special cases for package names that differ from import names
-        import_name = dep
-        if dep == "psycopg2-binary":
-            import_name = "psycopg2"
-        
-        try:
-            importlib.import_module(import_name)
-            print(f"  ✓ {dep}")
-        except ImportError:
-            print(f"  ✗ {dep} (NOT INSTALLED)")
-            missing_deps.append(dep)
-    
-    return len(missing_deps) == 0
+    return _report(*_probe_dependencies())
+
+def _is_dir(path):
+    """Return True if path is a directory, with a single stat() call"""
+    # One stat() answers both existence and type - an exists()+isdir()
+    # pair would pay two syscalls for the same check
+    try:
+        return stat.S_ISDIR(os.stat(path).st_mode)
+    except FileNotFoundError:
+        return False
+
+def _probe_directories():
+    """Probe required directories; returns _report arguments without emitting"""
+    found_flags = [_is_dir(directory) for directory in REQUIRED_DIRS]
+    return ("\nChecking directories...", REQUIRED_DIRS, found_flags, "MISSING")
 
 def check_directories():
     """Check if required directories exist"""
-    print("\nChecking directories...")
-    
-    required_dirs = [
-        "Datasets"
-    ]
-    
-    missing_dirs = []
-    for directory in required_dirs:
-        if os.path.exists(directory) and os.path.isdir(directory):
-            print(f"  ✓ {directory}")
-        else:
-            print(f"  ✗ {directory} (MISSING)")
-            missing_dirs.append(directory)
-    
-    return len(missing_dirs) == 0
+    return _report(*_probe_directories())
+
+async def _gather_probes():
+    """Run the three blocking probe phases concurrently
+
+    Every probe is blocking I/O (scandir, finder walks, stat), so driving
+    them through executor threads makes wall time roughly the slowest
+    phase instead of the sum of all three. Only the probes overlap -
+    reporting happens afterwards so output order stays deterministic.
+    """
+    import asyncio
+    loop = asyncio.get_running_loop()
+    return await asyncio.gather(
+        loop.run_in_executor(None, _probe_files),
+        loop.run_in_executor(None, _probe_dependencies),
+        loop.run_in_executor(None, _probe_directories))
 
 def main():
     """Main test function"""
-    print("Healthcare Research Dashboard Setup Test")
-    print("=" * 50)
-    
-    files_ok = check_files()
-    deps_ok = check_python_dependencies()
-    dirs_ok = check_directories()
-    
-    print("\n" + "=" * 50)
+    _emit("Healthcare Research Dashboard Setup Test")
+    _emit("=" * 50)
+
+    if "--fast" in sys.argv:
+        # A broken checkout usually fails every phase for the same root
+        # cause (wrong CWD); when only the exit code matters, run
+        # serially and skip the costlier phases after a files failure
+        files_ok = check_files()
+        if not files_ok:
+            _emit("\n" + "=" * 50)
+            _emit("✗ Some checks failed. Please review the issues above.")
+            _flush_output()
+            return False
+        deps_ok = check_python_dependencies()
+        dirs_ok = check_directories()
+    else:
+        import asyncio
+        files_ok, deps_ok, dirs_ok = [
+            _report(*args) for args in asyncio.run(_gather_probes())]
+
+    _emit("\n" + "=" * 50)
     if files_ok and deps_ok and dirs_ok:
-        print("✓ All checks passed! Your setup is ready.")
-        print("\nNext steps:")
-        print("1. Set up your PostgreSQL database")
-        print("2. Load your data using load-data-db.sql")
-        print("3. Update database connection in db_connector.py")
-        print("4. Run 'python db_connector.py' to generate dashboard data")
-        print("5. Open index.html in your browser to view the dashboard")
-        return True
+        _emit("✓ All checks passed! Your setup is ready.")
+        _emit("\nNext steps:")
+        _emit("1. Set up your PostgreSQL database")
+        _emit("2. Load your data using load-data-db.sql")
+        _emit("3. Update database connection in db_connector.py")
+        _emit("4. Run 'python db_connector.py' to generate dashboard data")
+        _emit("5. Open index.html in your browser to view the dashboard")
+        success = True
     else:
-        print("✗ Some checks failed. Please review the issues above.")
-        return False
+        _emit("✗ Some checks failed. Please review the issues above.")
+        success = False
+    _flush_output()
+    return success
 
 if __name__ == "__main__":
     success = main()
-    sys.exit(0 if success else 1)
\ No newline at end of file
+    # os._exit skips interpreter shutdown (atexit hooks, GC of whatever
+    # got imported); only the exit code matters to callers, so flush
+    # explicitly and leave immediately
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os._exit(0 if success else 1)
\ No newline at end of file